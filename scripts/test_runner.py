@@ -1,16 +1,18 @@
 import sys
 
-from pytest import main
-
 
 def test_without_coverage():
     """Run tests without coverage."""
+    from pytest import main
+
     sys.argv = ["pytest"] + sys.argv[1:]
     main()
 
 
 def test_with_coverage():
     """Run tests with coverage and HTML report."""
+    from pytest import main
+
     sys.argv = [
         "pytest",
         "--cov=world_builder",
@@ -22,6 +24,8 @@ def test_with_coverage():
 
 def test_with_ci_coverage():
     """Run tests with coverage and XML report for CI."""
+    from pytest import main
+
     sys.argv = [
         "pytest",
         "--cov=world_builder",
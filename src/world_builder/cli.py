@@ -1,10 +1,10 @@
-import pyperclip  # type: ignore
+from functools import cache
+from typing import TYPE_CHECKING, Callable
+
 import typer
-from rich import print as pprint
-from rich.syntax import Syntax
 
-from world_builder.errors import Err, Ok
-from world_builder.prompts import PromptError, PromptErrorType, get_prompt_by_version
+if TYPE_CHECKING:  # pragma: no cover
+    from world_builder.prompts import PromptError, PromptErrorType
 
 app = typer.Typer(
     help="""
@@ -16,6 +16,11 @@ app = typer.Typer(
 
 
 def _print_prompt_usage_helper(prompt: str):
+    # Deferred so `--help` and other subcommands don't pay for Rich/pyperclip
+    import pyperclip  # type: ignore
+    from rich import print as pprint
+    from rich.syntax import Syntax
+
     pprint(
         "[bold light_pink1]:astonished: Looks like you forgot a command "
         "or are using this CLI for the first time![/bold light_pink1]\n"
@@ -47,17 +52,24 @@ def _print_prompt_usage_helper(prompt: str):
     )
 
 
-def _handle_prompt_error(error: PromptError) -> None:
+@cache
+def _prompt_error_formatters() -> dict["PromptErrorType", Callable[[object], str]]:
+    """Map prompt error types to CLI messages, built on first use."""
+    from world_builder.prompts import PromptErrorType
+
+    return {
+        PromptErrorType.NOT_FOUND: "Prompt not found: {}".format,
+        PromptErrorType.INVALID_VERSION: "Invalid version: {}".format,
+        PromptErrorType.IO_ERROR: "File error: {}".format,
+    }
+
+
+def _handle_prompt_error(error: "PromptError") -> None:
     """Handle errors related to prompts."""
-    match error.type:
-        case PromptErrorType.NOT_FOUND:
-            print(f"Prompt not found: {error.source}")
-        case PromptErrorType.INVALID_VERSION:
-            print(f"Invalid version: {error.source}")
-        case PromptErrorType.IO_ERROR:
-            print(f"File error: {error.source}")
-        case _:
-            print(f"An unexpected error occurred: {error.source}")
+    format_message = _prompt_error_formatters().get(
+        error.type, "An unexpected error occurred: {}".format
+    )
+    print(format_message(error.source))
 
     raise typer.Exit(code=1)
 
@@ -66,6 +78,10 @@ def _handle_prompt_error(error: PromptError) -> None:
 def main(ctx: typer.Context):
     # If no subcommand is invoked, show the default prompt usage
     if ctx.invoked_subcommand is None:
+        # Imported here so subcommands skip loading pydantic-xml/lxml
+        from world_builder.errors import Err, Ok
+        from world_builder.prompts import get_prompt_by_version
+
         # Get the prompt text for the current version since no version is specified
         result = get_prompt_by_version()
 
@@ -9,7 +9,7 @@ from result import Err, Ok, Result  # noqa: F401
 E = TypeVar("E", bound=Enum)
 
 
-@dataclass
+@dataclass(slots=True)
 class Error(Generic[E]):
     """Generic error structure"""
 
@@ -22,11 +22,22 @@ class Error(Generic[E]):
         return self.type.value
 
     def with_context(self, **kwargs) -> "Error[E]":
-        """Add context information"""
-        new_context = {**self.context, **kwargs}
-        return Error(type=self.type, source=self.source, context=new_context)
+        """
+        Add context information
+
+        With no kwargs the same instance is returned rather than a copy, so
+        mutating the result's `context` in place also changes this error.
+        """
+        if not kwargs:
+            return self
+
+        return Error(type=self.type, source=self.source, context=self.context | kwargs)
 
     def __str__(self) -> str:
+        # Common case for type-only errors, skip building and joining parts
+        if not self.source and not self.context:
+            return self.message
+
         parts = [self.message]
         if self.source:
             parts.append(f"Source: {self.source}")
@@ -1,8 +1,11 @@
-from enum import Enum
-from pathlib import Path
-from xml.etree.ElementTree import ParseError
-
-from lxml.etree import XMLSyntaxError
+from enum import StrEnum
+from functools import lru_cache
+from hashlib import blake2b
+from importlib.resources import files
+from importlib.resources.abc import Traversable
+from typing import Any
+
+from lxml.etree import XMLParser, XMLSyntaxError
 from pydantic import ValidationError
 from pydantic_xml import ParsingError
 
@@ -10,7 +13,7 @@ from world_builder.data import CodeChanges
 from world_builder.errors import Err, Error, Ok, Result
 
 
-class PromptErrorType(Enum):
+class PromptErrorType(StrEnum):
     """Types of errors that can occur when working with prompts."""
 
     NOT_FOUND = "Prompt not found"
@@ -20,7 +23,7 @@ class PromptErrorType(Enum):
     UNKNOWN_ERROR = "An unknown error occurred"
 
 
-class ParserErrorType(Enum):
+class ParserErrorType(StrEnum):
     """Error types for parsing the prompt result."""
 
     INVALID_XML = "Invalid XML format"
@@ -31,8 +34,24 @@ class ParserErrorType(Enum):
 PromptError = Error[PromptErrorType]
 ParserError = Error[ParserErrorType]
 
-
-class PromptVersion(Enum):
+# pydantic-xml builds each model's serializer once at class creation, so the
+# only per-call setup left to hoist out of parsing is the lxml parser itself
+_XML_PARSER_OPTIONS: dict[str, Any] = dict(
+    remove_blank_text=True,
+    collect_ids=False,
+    huge_tree=False,
+    # LLM output is untrusted, never load external entities (XXE). Internal
+    # ones are expanded, dropping them would silently truncate text, and
+    # huge_tree=False keeps lxml's expansion limits (billion laughs) on
+    resolve_entities="internal",
+)
+_XML_PARSER = XMLParser(**_XML_PARSER_OPTIONS)
+# Text input is encoded to UTF-8 by us, so any encoding named in its XML
+# declaration no longer applies and must not be honoured
+_TEXT_XML_PARSER = XMLParser(**_XML_PARSER_OPTIONS, encoding="utf-8")
+
+
+class PromptVersion(StrEnum):
     """Accepted prompt versions."""
 
     V0_1 = "v0.1"
@@ -40,28 +59,58 @@ class PromptVersion(Enum):
 
 CURRENT_VERSION = PromptVersion.V0_1
 
+# Resolved once through the package loader so this also works from zips/wheels
+PROMPTS_DIR: Traversable = files("world_builder").joinpath("prompts")
+
+# The enum is fixed at import time, so build the lookup structures once.
+# `Ok` is immutable, so the successful results can be shared between calls.
+_OK_BY_VERSION: dict[str, Ok[str]] = {v.value: Ok(v.value) for v in PromptVersion}
+_VALID_VERSIONS_TUPLE: tuple[str, ...] = tuple(sorted(_OK_BY_VERSION))
+_VALID_VERSIONS_STR = str(list(_VALID_VERSIONS_TUPLE))
+
+# How much of the input markup is kept on parser errors
+_MARKUP_PREVIEW_CHARS = 512
+
+# Successful parses, keyed by input kind and a blake2b digest of the markup.
+# Inputs seen only once map to None, see `_parse_code_changes`
+_PARSE_CACHE_SIZE = 32
+_PARSE_CACHE: dict[tuple[bool, bytes], CodeChanges | None] = {}
+
+# Delimiters used to find the document inside a raw LLM response
+_CODE_CHANGE_START_TAG = b"<code-change"
+_CODE_CHANGE_END_TAG = b"</code-change>"
+_XML_FENCE = b"```xml"
+_FENCE = b"```"
+
 
 def _validate_and_normalize_version(
     version: str | PromptVersion,
 ) -> Result[str, PromptError]:
     """Validate and normalize version input."""
     if isinstance(version, PromptVersion):
-        return Ok(version.value)
+        return _OK_BY_VERSION[version.value]
     elif isinstance(version, str):
+        # Already-normalized input is the common case, skip the string copies
+        cached = _OK_BY_VERSION.get(version)
+        if cached is not None:
+            return cached
+
         normalized = version.lower().strip()
-        # Check if it's a valid version
-        valid_versions = [v.value for v in PromptVersion]
-        if normalized in valid_versions:
-            return Ok(normalized)
+        # Check if it's a valid version, returning the cached result
+        cached = _OK_BY_VERSION.get(normalized)
+        if cached is not None:
+            return cached
         else:
             return Err(
                 Error(
                     type=PromptErrorType.NOT_FOUND,
-                    source=f"Unknown version '{normalized}'. Valid: {valid_versions}",
+                    source=(
+                        f"Unknown version '{normalized}'. Valid: {_VALID_VERSIONS_STR}"
+                    ),
                 ).with_context(
                     input_version=version,
                     normalized_version=normalized,
-                    valid_versions=valid_versions,
+                    valid_versions=list(_VALID_VERSIONS_TUPLE),
                 )
             )
     else:
@@ -73,11 +122,29 @@ def _validate_and_normalize_version(
         )
 
 
+def _prompt_file_path(version: str) -> Traversable:
+    """Get the path of the prompt file for a version."""
+    return PROMPTS_DIR.joinpath(f"{version}.md")
+
+
+@lru_cache(maxsize=8)
+def _read_prompt_file(version: str) -> str:
+    """
+    Read the raw prompt text for a version, raising on failure.
+
+    Prompt files are static per-version resources, so successful reads are
+    cached for the lifetime of the process, failures are never cached.
+    Use `_read_prompt_file.cache_clear()` to reset.
+    """
+    return _prompt_file_path(version).read_text(encoding="utf-8")
+
+
 def _load_prompt_file(version: str) -> Result[str, PromptError]:
     """Load the prompt file based on the version."""
-    prompt_file_path = Path(__file__).parent / "prompts" / f"{version}.md"
-
-    if not prompt_file_path.exists():
+    try:
+        return Ok(_read_prompt_file(version))
+    except FileNotFoundError:
+        prompt_file_path = _prompt_file_path(version)
         return Err(
             Error(
                 type=PromptErrorType.NOT_FOUND,
@@ -86,31 +153,23 @@ def _load_prompt_file(version: str) -> Result[str, PromptError]:
                 file_path=str(prompt_file_path), version=version, operation="file_load"
             )
         )
-
-    try:
-        with open(prompt_file_path, "r", encoding="utf-8") as file:
-            return Ok(file.read())
-    except PermissionError as e:
+    except OSError as e:
+        # Any other filesystem failure (permissions, EISDIR, ...) is an I/O error
+        prompt_file_path = _prompt_file_path(version)
+        kind = "Permission denied" if isinstance(e, PermissionError) else "I/O error"
         return Err(
             Error(
                 type=PromptErrorType.IO_ERROR,
-                source=f"Permission denied: {e}",
+                source=f"{kind}: {e}",
             ).with_context(
                 file_path=str(prompt_file_path),
                 operation="read",
-                error_type="permission_denied",
+                exception_type=type(e).__name__,
             )
         )
-    except FileNotFoundError as e:
-        # This shouldn't happen since we check exists(), but just in case
-        return Err(
-            Error(
-                type=PromptErrorType.NOT_FOUND,
-                source=f"File disappeared: {e}",
-            ).with_context(file_path=str(prompt_file_path), operation="read")
-        )
     except Exception as e:
         # Catch-all for any other exceptions
+        prompt_file_path = _prompt_file_path(version)
         return Err(
             Error(
                 type=PromptErrorType.UNKNOWN_ERROR,
@@ -151,29 +210,175 @@ def get_prompt_by_version(
     :param version: The version of the prompt to retrieve.
     :returns: Result containing either the prompt content (Ok) or an error (Err)
     """
+    # Enum members are already valid and normalized, nothing to validate
+    if isinstance(version, PromptVersion):
+        return _load_prompt_file(version.value)
+
     return _validate_and_normalize_version(version).and_then(_load_prompt_file)
 
 
-def parse_prompt_result(markup: str) -> Result[CodeChanges, ParserError]:
+def _markup_context(markup: str | bytes, markup_bytes: bytes) -> dict[str, Any]:
+    """
+    Summarize markup for error context without retaining the whole input.
+
+    LLM output can be megabytes long, so errors keep a bounded preview plus
+    the length and a short hash for correlating against the original input.
+    Length and hash are taken from the already encoded `markup_bytes`, so
+    both are in UTF-8 bytes whether the caller passed text or bytes.
+    """
+    preview = markup[:_MARKUP_PREVIEW_CHARS]
+    return {
+        "markup_preview": (
+            preview.decode("utf-8", errors="replace")
+            if isinstance(preview, bytes)
+            else preview
+        ),
+        "markup_len": len(markup_bytes),
+        "markup_hash": blake2b(markup_bytes, digest_size=8).hexdigest(),
+    }
+
+
+def _find_xml_fence(markup: bytes, start: int) -> int:
+    """
+    Find the next ```xml fence that opens a line, or -1.
+
+    Only indentation and a longer backtick run may precede it on its line, so
+    a fence mentioned in prose ("reply inside a ```xml block") is skipped.
+    """
+    fence = markup.find(_XML_FENCE, start)
+    while fence != -1:
+        line_start = markup.rfind(b"\n", 0, fence) + 1
+        if not markup[line_start:fence].lstrip(b" \t").strip(b"`"):
+            return fence
+        fence = markup.find(_XML_FENCE, fence + 1)
+    return -1
+
+
+def _extract_code_change(markup: bytes) -> tuple[bytes, int]:
+    """
+    Slice the `<code-change>` document out of surrounding LLM chatter.
+
+    Markup that is only whitespace before its first tag (including an XML
+    declaration or doctype) is returned untouched. Otherwise the first ```xml
+    fence is used, up to its last `</code-change>` (or closing fence), and
+    without one everything outside the first `<code-change` and the last
+    `</code-change>` is dropped.
+    Plain `bytes.find` keeps this linear with no regex engine involved.
+
+    :returns: The document and its byte offset into `markup`.
+    """
+    first_tag = markup.find(b"<")
+    if first_tag <= 0 or markup[:first_tag].isspace():
+        return markup, 0
+
+    fence = _find_xml_fence(markup, 0)
+    if fence != -1:
+        start = fence + len(_XML_FENCE)
+        # The document starts on the line after the fence (declarations must
+        # come first), unless it was written on the same line
+        newline = markup.find(b"\n", start)
+        if newline != -1 and (newline == start or markup[start:newline].isspace()):
+            start = newline + 1
+        # Bodies of <add>/<modify> often carry their own ``` fences, so the
+        # document ends at the last end tag before the next ```xml block.
+        # Only without one is the closing fence used, an unterminated fence
+        # runs to the end and the XML parser reports the rest
+        limit = _find_xml_fence(markup, start)
+        if limit == -1:
+            limit = len(markup)
+        end = markup.rfind(_CODE_CHANGE_END_TAG, start, limit)
+        if end != -1:
+            return markup[start : end + len(_CODE_CHANGE_END_TAG)], start
+        end = markup.find(_FENCE, start, limit)
+        return markup[start : end if end != -1 else limit], start
+
+    start = markup.find(_CODE_CHANGE_START_TAG)
+    if start == -1:
+        return markup, 0
+
+    end = markup.rfind(_CODE_CHANGE_END_TAG)
+    if end < start:
+        # Unterminated, let the XML parser report what's wrong
+        return markup[start:], start
+    return markup[start : end + len(_CODE_CHANGE_END_TAG)], start
+
+
+def _input_position(
+    markup: bytes, offset: int, line: int | None, column: int | None
+) -> tuple[int | None, int | None]:
+    """Map a line/column in the document extracted at `offset` back to `markup`."""
+    if not offset or line is None:
+        return line, column
+
+    if line == 1 and column is not None:
+        # The document's first line starts part way into a line of the input
+        column += offset - (markup.rfind(b"\n", 0, offset) + 1)
+    return line + markup.count(b"\n", 0, offset), column
+
+
+def _parse_code_changes(markup: bytes, from_text: bool) -> CodeChanges:
+    """
+    Parse markup into a CodeChanges object owned by the caller, raising on failure.
+    `from_text` marks markup we encoded from `str`, see `_TEXT_XML_PARSER`.
+
+    Most responses are only parsed once, so a first parse just records the
+    digest of the input and hands back the fresh model. Only when the same
+    input comes back (retries, re-rendering) is the model kept, in a small LRU
+    keyed by that digest, the (potentially huge) markup itself is never
+    retained. Cached models are never handed out directly, callers get a deep
+    copy they're free to mutate. Use `_PARSE_CACHE.clear()` to reset.
+    """
+    key = (from_text, blake2b(markup, digest_size=16).digest())
+    parser = _TEXT_XML_PARSER if from_text else _XML_PARSER
+    if key not in _PARSE_CACHE:
+        code_changes = CodeChanges.from_xml(markup, parser=parser)
+        if len(_PARSE_CACHE) >= _PARSE_CACHE_SIZE:
+            # Dicts keep insertion order, the first key is the least recently used
+            del _PARSE_CACHE[next(iter(_PARSE_CACHE))]
+        # First sighting, remember only the digest and skip the copy
+        _PARSE_CACHE[key] = None
+        return code_changes
+
+    cached = _PARSE_CACHE.pop(key)
+    if cached is None:
+        # Seen before, this time keep the parse
+        cached = CodeChanges.from_xml(markup, parser=parser)
+
+    # (Re)insert as the most recently used entry
+    _PARSE_CACHE[key] = cached
+    return cached.model_copy(deep=True)
+
+
+def parse_prompt_result(markup: str | bytes) -> Result[CodeChanges, ParserError]:
     """
     Parse the provided XML markup into a CodeChanges object.
+    Markdown code fences or prose around the `<code-change>` element are ignored.
 
-    :params markup: The XML markup to parse.
+    :params markup: The XML markup to parse, either text or encoded bytes
+                    (e.g. straight from a file or `sys.stdin.buffer`). Bytes
+                    follow their XML declaration's encoding (UTF-8 by default),
+                    text ignores it since it's already decoded.
     :returns: Result containing either the parsed CodeChanges object (Ok)
               or a ParserError (Err) with detailed context.
     """
+    # Encode once up front, lxml would otherwise re-encode text internally
+    markup_bytes = markup.encode("utf-8") if isinstance(markup, str) else markup
+
     # Validate input
-    if not markup or not markup.strip():
+    if not markup or markup.isspace():
         return Err(
             ParserError(
                 type=ParserErrorType.INVALID_XML,
                 source="Empty or whitespace-only markup provided",
-            ).with_context(markup=markup, operation="input_validation")
+            ).with_context(
+                **_markup_context(markup, markup_bytes), operation="input_validation"
+            )
         )
 
+    document, document_offset = _extract_code_change(markup_bytes)
+
     try:
-        code_changes = CodeChanges.from_xml(markup)
-        return Ok(code_changes)
+        return Ok(_parse_code_changes(document, isinstance(markup, str)))
 
     except ParsingError as pe:
         # pydantic-xml specific parsing errors
@@ -182,43 +387,54 @@ def parse_prompt_result(markup: str) -> Result[CodeChanges, ParserError]:
                 type=ParserErrorType.MISSING_ELEMENT,
                 source=f"XML structure error: {str(pe)}",
             ).with_context(
-                markup=markup,
+                **_markup_context(markup, markup_bytes),
                 operation="xml_structure_parsing",
+                document_offset=document_offset,
                 error_type="ParsingError",
             )
         )
 
     except ValidationError as ve:
-        # Pydantic validation errors
-        error_details = []
-        for error in ve.errors():
-            loc = " -> ".join(str(x) for x in error["loc"]) if error["loc"] else "root"
-            error_details.append(f"{loc}: {error['msg']}")
+        # Pydantic validation errors, `errors()` builds a new list on every call
+        ve_errors = ve.errors()
+        error_details = "; ".join(
+            f"{' -> '.join(map(str, error['loc'])) or 'root'}: {error['msg']}"
+            for error in ve_errors
+        )
 
         return Err(
             ParserError(
                 type=ParserErrorType.PARSING_ERROR,
-                source=f"Validation failed: {'; '.join(error_details)}",
+                source=f"Validation failed: {error_details}",
             ).with_context(
-                markup=markup,
+                **_markup_context(markup, markup_bytes),
                 operation="validation",
+                document_offset=document_offset,
                 error_type="ValidationError",
-                error_count=len(ve.errors()),
+                error_count=len(ve_errors),
             )
         )
 
-    except (ParseError, XMLSyntaxError) as xml_error:
-        # Handle both standard library and lxml XML parsing errors
+    except XMLSyntaxError as xml_error:
+        # lxml's message (and `position`, which matches it) counts from the
+        # extracted document, keep those and add where that is in the input
+        line_number, column = getattr(xml_error, "position", None) or (None, None)
+        input_line_number, input_column = _input_position(
+            markup_bytes, document_offset, line_number, column
+        )
         return Err(
             ParserError(
                 type=ParserErrorType.INVALID_XML,
                 source=f"Malformed XML: {str(xml_error)}",
             ).with_context(
-                markup=markup,
+                **_markup_context(markup, markup_bytes),
                 operation="xml_parsing",
+                document_offset=document_offset,
                 error_type=type(xml_error).__name__,
-                line_number=getattr(xml_error, "lineno", None),
-                column=getattr(xml_error, "offset", None),
+                line_number=line_number,
+                column=column,
+                input_line_number=input_line_number,
+                input_column=input_column,
             )
         )
 
@@ -229,8 +445,9 @@ def parse_prompt_result(markup: str) -> Result[CodeChanges, ParserError]:
                 type=ParserErrorType.PARSING_ERROR,
                 source=f"Unexpected error during parsing: {str(e)}",
             ).with_context(
-                markup=markup,
+                **_markup_context(markup, markup_bytes),
                 operation="general_parsing",
+                document_offset=document_offset,
                 error_type=type(e).__name__,
             )
         )
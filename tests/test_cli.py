@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from unittest.mock import Mock, patch
 
 import pytest
@@ -11,15 +13,14 @@ from world_builder.prompts import (
     PromptErrorType,
 )
 
+# Stateless between invocations, so one runner is shared by every test
+runner = CliRunner()
+
 
 class TestCLI:
     """Test cases for cli.py to achieve 100% coverage."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.runner = CliRunner()
-
-    @patch("world_builder.cli.get_prompt_by_version")
+    @patch("world_builder.prompts.get_prompt_by_version")
     @patch("world_builder.cli._print_prompt_usage_helper")
     def test_main_callback_no_subcommand_success(
         self, mock_print_helper, mock_get_prompt
@@ -30,14 +31,14 @@ class TestCLI:
         mock_get_prompt.return_value = Ok(test_prompt)
 
         # Run the CLI without any command
-        result = self.runner.invoke(app, [])
+        result = runner.invoke(app, [])
 
         # Verify the call and exit
         mock_get_prompt.assert_called_once_with()
         mock_print_helper.assert_called_once_with(test_prompt)
         assert result.exit_code == 0
 
-    @patch("world_builder.cli.get_prompt_by_version")
+    @patch("world_builder.prompts.get_prompt_by_version")
     @patch("world_builder.cli._handle_prompt_error")
     def test_main_callback_no_subcommand_error(
         self, mock_handle_error, mock_get_prompt
@@ -54,15 +55,15 @@ class TestCLI:
         mock_handle_error.side_effect = typer.Exit(code=1)
 
         # Run the CLI without any command
-        result = self.runner.invoke(app, [])
+        result = runner.invoke(app, [])
 
         # Verify the call and error handling
         mock_get_prompt.assert_called_once_with()
         mock_handle_error.assert_called_once_with(test_error)
         assert result.exit_code == 1
 
-    @patch("world_builder.cli.pyperclip.copy")
-    @patch("world_builder.cli.pprint")
+    @patch("pyperclip.copy")
+    @patch("rich.print")
     def test_print_prompt_usage_helper(self, mock_pprint, mock_copy):
         """Test the _print_prompt_usage_helper function."""
         test_prompt = "This is a test prompt"
@@ -161,3 +162,22 @@ class TestCLI:
                 "An unexpected error occurred: unknown_error"
             )
             assert exc_info.value.exit_code == 1
+
+    def test_help_does_not_load_prompt_pipeline(self):
+        """Test that --help skips importing the prompt/XML parsing modules."""
+        script = (
+            "import sys\n"
+            "from typer.testing import CliRunner\n"
+            "from world_builder.cli import app\n"
+            "result = CliRunner().invoke(app, ['--help'])\n"
+            "assert result.exit_code == 0, result.output\n"
+            "heavy = ['world_builder.prompts', 'pydantic_xml', 'lxml', 'pyperclip']\n"
+            "print(','.join(m for m in heavy if m in sys.modules))\n"
+        )
+
+        # Run in a fresh interpreter since this process has already imported them
+        completed = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        )
+
+        assert completed.stdout.strip() == ""
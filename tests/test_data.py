@@ -1,3 +1,5 @@
+import pytest
+
 from world_builder.data import CodeChanges
 
 EXAMPLE_XML = """
@@ -46,11 +48,16 @@ EXAMPLE_XML = """
 """
 
 
+@pytest.fixture(scope="module")
+def example_code_change() -> CodeChanges:
+    """Parse EXAMPLE_XML once for the tests that only read the result."""
+    return CodeChanges.from_xml(EXAMPLE_XML)
+
+
 class TestDataDeserialization:
-    def test_deserialize_code_change(self):
+    def test_deserialize_code_change(self, example_code_change):
         """Test parsing a complete code change XML structure."""
-        # Parse the XML markup
-        code_change = CodeChanges.from_xml(EXAMPLE_XML)
+        code_change = example_code_change
 
         # Check the summary
         assert code_change.summary == "[Brief overview of all changes being made]"
@@ -264,10 +271,9 @@ class TestDataDeserialization:
         assert len(code_change.additional_steps) == 0
         assert len(code_change.verification_steps) == 0
 
-    def test_serialization_roundtrip(self):
+    def test_serialization_roundtrip(self, example_code_change):
         """Test that parsing and serializing produces equivalent results."""
-        # Parse the original markup
-        original_code_change = CodeChanges.from_xml(EXAMPLE_XML)
+        original_code_change = example_code_change
 
         # Serialize back to XML
         serialized_xml = original_code_change.to_xml(pretty_print=True)
@@ -76,8 +76,9 @@ class TestErrors:
 
         new_error = original_error.with_context()
 
-        # Should return a new instance with same context
-        assert new_error is not original_error
+        # Nothing to add, so the same instance (and context dict) is returned
+        assert new_error is original_error
+        assert new_error.context is original_error.context
         assert new_error.type == original_error.type
         assert new_error.source == original_error.source
         assert new_error.context == {"original": "value"}